@@ -13,40 +13,79 @@
 # - Bookmarks are stored as a JSON dict at "$dbpath/entries.json".
 # - Optional webpage archive is stored at "$dbpath/archive/<$id[0:2]>/<$id[2:-1]>/index.html".
 # - Internal schema veraion stored at "$dbpath/format".
+# - Fetched webpage titles are cached at "$LINKPAD_BASEDIR/.cache/title/<sha1($url)>.json".
 #
 # Dependencies:
 # =============
 # - python 3.x
 # - git
 # - wget (for archiving)
+# - orjson (optional, for faster JSON parsing)
+# - pygit2 (optional, for committing changes without spawning 'git')
 
 import os
 import sys
 import collections
 import copy
 import click
-import yaml
 import json
-import sh
 import datetime
 import uuid
 import urllib.parse
-import bs4
 import http.client
 import tempfile
-import requests
 import time
-import random
 import multiprocessing.dummy
+import threading
 import functools
-import tqdm
+import itertools
+import operator
 import configparser
 import shlex
+import re
+import socket
+import hashlib
+import shutil
+
+# Note: the heavier third-party modules (requests, bs4, sh, yaml) are
+# imported lazily inside the functions which need them, to keep CLI startup
+# fast for the common commands which don't.
+
+# Optional: use 'orjson' (if available) for faster JSON parsing. Encoding
+# always goes through the stdlib, since orjson can't produce the same (ASCII-only)
+# output and databases shared between machines would churn.
+try:
+    import orjson
+    def json_loads(s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the stdlib, e.g. it rejects escaped lone
+            # surrogates ("\ud83d") which json.dumps() happily writes
+            return json.loads(s)
+except ImportError:
+    json_loads = json.loads
 
 # Workaround for "http.client.HTTPException: got more than 100 headers" exceptions.
 # Some servers can be misconfigured and can return an expected # of headers.
 http.client._MAXHEADERS = 1000
 
+# Cache DNS lookups in-process, since many bookmarks tend to share the same
+# hostnames and the system resolver may not cache anything. Lookups are
+# cached per 5-minute window; failed lookups are never cached. The wrapper
+# is only installed by http_session(), i.e. once we actually go online.
+DNS_CACHE_TTL = 300
+socket_getaddrinfo_uncached = socket.getaddrinfo
+
+@functools.lru_cache(maxsize=512)
+def socket_getaddrinfo_cached(host, port, family, type, proto, flags, ttl_window):
+    return socket_getaddrinfo_uncached(host, port, family, type, proto, flags)
+
+def socket_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """ Drop-in replacement for socket.getaddrinfo() which caches results """
+    ttl_window = int(time.time() // DNS_CACHE_TTL)
+    return list(socket_getaddrinfo_cached(host, port, family, type, proto, flags, ttl_window))
+
 VERSION = 1.2
 PROGRAM = os.path.basename(sys.argv[0])
 
@@ -54,6 +93,12 @@ USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_6) AppleWebKit/537.36
 
 LINKPAD_BASEDIR = os.environ.get('LINKPAD_BASEDIR') or os.path.expanduser('~/.linkpad')
 
+# How long (in seconds) to re-use cached webpage titles, under "$LINKPAD_BASEDIR/.cache/title/"
+PAGE_TITLE_CACHE_TTL = 7*86400
+
+# Connection/read timeout (in seconds) when fetching a webpage title for 'add'
+PAGE_TITLE_TIMEOUT = 10
+
 # User-editable entry fields
 DB_ENTRY_PUBLIC_FIELDS =   [ 'url',
                              'title',
@@ -67,6 +112,10 @@ DB_ENTRY_PRIVATE_FIELDS =  [ 'id',
                              'removed',
                              'removed_date',
                              'removed_reason' ]
+DB_ENTRY_ALL_FIELDS = DB_ENTRY_PUBLIC_FIELDS + DB_ENTRY_PRIVATE_FIELDS
+
+# Datetime format used for dates stored in the database file
+DB_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ%z'
 
 
 
@@ -79,9 +128,9 @@ def datetime_utc_to_local(utc_dt):
     # https://stackoverflow.com/a/13287083
     return utc_dt.replace(tzinfo=datetime.timezone.utc).astimezone(tz=None)
 
-def datetime_format_relative(utc_dt):
-    """ Format date relative to the current time, e.g. "2 hours ago" """
-    delta = datetime.datetime.now(datetime.timezone.utc) - utc_dt
+def datetime_format_relative(utc_dt, now=None):
+    """ Format date relative to the current time (or 'now', if given), e.g. "2 hours ago" """
+    delta = (now or datetime.datetime.now(datetime.timezone.utc)) - utc_dt
     if delta.days < 2:
         seconds = (delta.days * 86400) + delta.seconds
         minutes = seconds // 60
@@ -105,6 +154,72 @@ def datetime_format_relative(utc_dt):
         months_mod = months % 12
         return "{} years, {} months ago".format(years, months_mod) if months_mod > 0 else "{} years ago".format(years)
 
+# ANSI escape sequences for format_colorize() style mnemonics
+FORMAT_STYLES = {
+    # ANSI styles
+    'none':             "\x1b[0m",
+    'bold':             "\x1b[1m",
+    'bright':           "\x1b[1m",
+    'dim':              "\x1b[2m",
+    'italics':          "\x1b[3m",
+    'underscore':       "\x1b[4m",
+    'blink':            "\x1b[5m",
+    'reverse':          "\x1b[7m",
+    # ANSI foreground
+    'fg=black':         "\x1b[30m",
+    'fg=red':           "\x1b[31m",
+    'fg=green':         "\x1b[32m",
+    'fg=yellow':        "\x1b[33m",
+    'fg=blue':          "\x1b[34m",
+    'fg=magenta':       "\x1b[35m",
+    'fg=cyan':          "\x1b[36m",
+    'fg=white':         "\x1b[37m",
+    'fg=default':       "\x1b[39m",
+    'fg=brightblack':   "\x1b[90m",
+    'fg=brightred':     "\x1b[91m",
+    'fg=brightgreen':   "\x1b[92m",
+    'fg=brightyellow':  "\x1b[93m",
+    'fg=brightblue':    "\x1b[94m",
+    'fg=brightmagenta': "\x1b[95m",
+    'fg=brightcyan':    "\x1b[96m",
+    'fg=brightwhite':   "\x1b[97m",
+    # ANSI background
+    'bg=black':         "\x1b[40m",
+    'bg=red':           "\x1b[41m",
+    'bg=green':         "\x1b[42m",
+    'bg=yellow':        "\x1b[43m",
+    'bg=blue':          "\x1b[44m",
+    'bg=magenta':       "\x1b[45m",
+    'bg=cyan':          "\x1b[46m",
+    'bg=white':         "\x1b[47m",
+    'bg=default':       "\x1b[49m",
+    'bg=brightblack':   "\x1b[100m",
+    'bg=brightred':     "\x1b[101m",
+    'bg=brightgreen':   "\x1b[102m",
+    'bg=brightyellow':  "\x1b[103m",
+    'bg=brightblue':    "\x1b[104m",
+    'bg=brightmagenta': "\x1b[105m",
+    'bg=brightcyan':    "\x1b[106m",
+    'bg=brightwhite':   "\x1b[107m",
+}
+
+# Matches a Tmux-style "#[...]" format mnemonic
+FORMAT_STYLE_RE = re.compile(r'#\[([^\]]*)\]')
+
+def format_style_escape(match):
+    """ Get the literal ANSI escape sequence(s) for a "#[...]" format mnemonic """
+    retval=""
+    for style in match.group(1).split(','):
+        # Named styles, e.g. 'bold', 'fg=red'
+        retval += FORMAT_STYLES.get(style, '')
+        # 256-color (8-bit) palette, e.g. 'fg=color:NNN' [https://en.wikipedia.org/wiki/ANSI_escape_code#8-bit]
+        if style[0:9] == 'fg=color:': retval += "\x1b[38;5;{}m".format(style[9:])
+        if style[0:9] == 'bg=color:': retval += "\x1b[48;5;{}m".format(style[9:])
+        # Truecolor (24-bit) palette, e.g. 'fg=truecolor:RRGGBB' [https://en.wikipedia.org/wiki/ANSI_escape_code#24-bit]
+        if style[0:13] == 'fg=truecolor:': retval += "\x1b[38;2;{};{};{}m".format(int(style[13:15],16), int(style[15:17],16), int(style[17:19],16))
+    return retval
+
+@functools.lru_cache(maxsize=64)
 def format_colorize(format):
     """
     Given a format template string, replace any format mnemonics
@@ -112,92 +227,96 @@ def format_colorize(format):
 
     Support Tmux-style formatting strings: #[...]
     """
-    retval=""
-    if '#[' in format:
-        pos1=0
-        pos2=0
-        pos3=format.find('#[', pos1)  # Find first format-start marker
-        retval += format[pos1:pos3]   # Append any text before the first format-start marker
-        while True:
-            pos1 = pos3
-            pos2 = format.find(']', pos1+2)  # Find next format-end marker
-            if pos2 < 0:
-                retval += format[pos1:]  # No counterpart format-end marker, just append remainder of string
-                break
-            for style in format[pos1+2:pos2].split(','):
-                # ANSI styles
-                if style == 'none': retval += "\x1b[0m"
-                if style == 'bold': retval += "\x1b[1m"
-                if style == 'bright': retval += "\x1b[1m"
-                if style == 'dim': retval += "\x1b[2m"
-                if style == 'italics': retval += "\x1b[3m"
-                if style == 'underscore': retval += "\x1b[4m"
-                if style == 'blink': retval += "\x1b[5m"
-                if style == 'reverse': retval += "\x1b[7m"
-                # ANSI foreground
-                if style == 'fg=black': retval += "\x1b[30m"
-                if style == 'fg=red': retval += "\x1b[31m"
-                if style == 'fg=green': retval += "\x1b[32m"
-                if style == 'fg=yellow': retval += "\x1b[33m"
-                if style == 'fg=blue': retval += "\x1b[34m"
-                if style == 'fg=magenta': retval += "\x1b[35m"
-                if style == 'fg=cyan': retval += "\x1b[36m"
-                if style == 'fg=white': retval += "\x1b[37m"
-                if style == 'fg=default': retval += "\x1b[39m"
-                if style == 'fg=brightblack': retval += "\x1b[90m"
-                if style == 'fg=brightred': retval += "\x1b[91m"
-                if style == 'fg=brightgreen': retval += "\x1b[92m"
-                if style == 'fg=brightyellow': retval += "\x1b[93m"
-                if style == 'fg=brightblue': retval += "\x1b[94m"
-                if style == 'fg=brightmagenta': retval += "\x1b[95m"
-                if style == 'fg=brightcyan': retval += "\x1b[96m"
-                if style == 'fg=brightwhite': retval += "\x1b[97m"
-                # ANSI background
-                if style == 'bg=black': retval += "\x1b[40m"
-                if style == 'bg=red': retval += "\x1b[41m"
-                if style == 'bg=green': retval += "\x1b[42m"
-                if style == 'bg=yellow': retval += "\x1b[43m"
-                if style == 'bg=blue': retval += "\x1b[44m"
-                if style == 'bg=magenta': retval += "\x1b[45m"
-                if style == 'bg=cyan': retval += "\x1b[46m"
-                if style == 'bg=white': retval += "\x1b[47m"
-                if style == 'bg=default': retval += "\x1b[49m"
-                if style == 'bg=brightblack': retval += "\x1b[100m"
-                if style == 'bg=brightred': retval += "\x1b[101m"
-                if style == 'bg=brightgreen': retval += "\x1b[102m"
-                if style == 'bg=brightyellow': retval += "\x1b[103m"
-                if style == 'bg=brightblue': retval += "\x1b[104m"
-                if style == 'bg=brightmagenta': retval += "\x1b[105m"
-                if style == 'bg=brightcyan': retval += "\x1b[106m"
-                if style == 'bg=brightwhite': retval += "\x1b[107m"
-                # 256-color (8-bit) palette, e.g. 'fg=color:NNN' [https://en.wikipedia.org/wiki/ANSI_escape_code#8-bit]
-                if style[0:9] == 'fg=color:': retval += "\x1b[38;5;{}m".format(style[9:])
-                if style[0:9] == 'bg=color:': retval += "\x1b[48;5;{}m".format(style[9:])
-                # Truecolor (24-bit) palette, e.g. 'fg=truecolor:RRGGBB' [https://en.wikipedia.org/wiki/ANSI_escape_code#24-bit]
-                if style[0:13] == 'fg=truecolor:': retval += "\x1b[38;2;{};{};{}m".format(int(style[13:15],16), int(style[15:17],16), int(style[17:19],16))
-            pos3 = format.find('#[',pos2+1)  # Find next format-start marker
-            retval += format[pos2+1:pos3 if (pos3 > 0) else None]  # Append text between current format-end and next format-start marker
-            if pos3 < 0:
+    if '#[' not in format:
+        return format
+    return FORMAT_STYLE_RE.sub(format_style_escape, format)
+
+@functools.lru_cache(maxsize=4096)
+def url_netloc(url):
+    """ Get the (cached) domain name portion of a url """
+    return urllib.parse.urlsplit(url).netloc
+
+@functools.lru_cache(maxsize=None)
+def http_session():
+    """ Get the shared HTTP session, so repeated requests to the same host can
+        re-use pooled keep-alive connections rather than doing a new TCP+TLS
+        handshake """
+    import requests
+    socket.getaddrinfo = socket_getaddrinfo
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32))
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32))
+    return session
+
+def url_read_until(response, marker, chunk_size=8192, max_size=1024*1024):
+    """ Read a streamed response body, stopping early once the (lowercase) marker
+        and the closing '>' after it are seen, or once max_size bytes are read """
+    content = bytearray()
+    marker_pos = -1
+    for chunk in response.iter_content(chunk_size):
+        start = max(0, len(content) - len(marker))  # Allow for a marker split across chunks
+        content += chunk
+        if marker_pos < 0:
+            # Only lowercase the newly-read tail, not the whole buffer
+            pos = content[start:].lower().find(marker)
+            if pos >= 0:
+                marker_pos = start + pos
+        if marker_pos >= 0 and content.find(b'>', marker_pos + len(marker)) >= 0:
+            break
+        if len(content) >= max_size:
+            break
+    return bytes(content)
+
+def url_drain(response, max_size=16*1024):
+    """ Read and discard the rest of a streamed response body, if it's small,
+        so the keep-alive connection goes back to the pool rather than being
+        dropped. Larger (or unknown-length, once past max_size) bodies are
+        left unread, since re-connecting is cheaper than downloading them. """
+    import requests
+    content_length = response.headers.get('Content-Length', '')
+    if content_length != '' and (not content_length.isdigit() or int(content_length) > max_size):
+        return
+    size = 0
+    try:
+        for chunk in response.iter_content(8192):
+            size += len(chunk)
+            if size > max_size:
                 break
-    else:
-        retval=format
-    return retval
+    except requests.exceptions.RequestException:
+        pass  # The status is all we needed, a broken body doesn't matter here
 
-def url_open(url, timeout=None):
+def is_html_response(response):
+    """ Check if a response is (or could be) an HTML page, based on its Content-Type """
+    content_type = response.headers.get('Content-Type', '').lower()
+    return content_type == '' or content_type.startswith(('text/html', 'application/xhtml'))
+
+def url_open(url, timeout=None, read_content=True, read_until=None):
     """ Get a webpage, check if it exists """
-    headers = requests.utils.default_headers()
-    headers.update({'User-Agent': USER_AGENT})
+    import requests
     page_exists = False
     error = None
     content = None
 
     try:
-        response = requests.get(url, headers=headers, timeout=timeout)
-        if response.ok:
-            page_exists = True
-            content = response.content
-        else:
-            error = 'HTTP error: {} {}'.format(response.status_code, response.reason.title())
+        # If we don't need the page content (or only need the content up to
+        # some marker), stream the response and leave the rest undownloaded.
+        # Small bodies are still drained, to keep the connection re-usable.
+        stream = (not read_content) or (read_until is not None)
+        with http_session().get(url, timeout=timeout, stream=stream) as response:
+            if response.ok:
+                page_exists = True
+                if read_content:
+                    if read_until is None:
+                        content = response.content
+                    elif is_html_response(response):
+                        content = url_read_until(response, read_until)
+                    else:
+                        content = b''  # Non-HTML (e.g. PDF or media), the marker won't be in there
+            else:
+                error = 'HTTP error: {} {}'.format(response.status_code, response.reason.title())
+            if not read_content:
+                url_drain(response)
     except requests.exceptions.SSLError as e:
         error = "SSL error: {}".format(e)
     except requests.exceptions.HTTPError as e:
@@ -242,31 +361,67 @@ def url_open(url, timeout=None):
 
 def is_page_exists(url, timeout=None):
     """ Check if a webpage exists """
-    exists, error, resp = url_open(url, timeout=timeout)
+    exists, error, resp = url_open(url, timeout=timeout, read_content=False)
     return exists, error
 
-def page_title(url):
-    """ Get webpage title """
-    exists, error, resp = url_open(url)
+def is_page_exists_many(urls, timeout=None, thread_count=16):
+    """ Check if a list of webpages exist, fetching them concurrently.
+        Returns a list of (exists, error) tuples, in the same order as urls """
+    if len(urls) == 0:
+        return []
+    pool = multiprocessing.dummy.Pool(min(thread_count, len(urls)))
+    try:
+        return pool.map(functools.partial(is_page_exists, timeout=timeout), urls)
+    finally:
+        pool.close()
+
+def page_title(url, cache_ttl=PAGE_TITLE_CACHE_TTL, timeout=None):
+    """ Get webpage title, using the on-disk title cache if possible """
+    cache_file = os.path.join(LINKPAD_BASEDIR, '.cache', 'title', hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+    try:
+        if time.time() - os.path.getmtime(cache_file) < cache_ttl:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)['title']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # Only download the page up to the end of the <title> element
+    exists, error, resp = url_open(url, timeout=timeout, read_until=b'</title')  # url_read_until() reads on up to the closing '>'
     if not exists:
         return ''
     if error is not None and len(error) > 0:
         return ''
     try:
+        import bs4
         page = bs4.BeautifulSoup(resp, "html.parser")
-        return page.title.string.strip() if page.title else ''
+        title = page.title.string.strip() if page.title else ''
     except Exception as e:
         return ''
 
+    # Save to the title cache, via a temp file + rename so that concurrent
+    # writers never leave a partially-written cache file behind
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(cache_file), delete=False) as f:
+            json.dump({ 'url': url, 'title': title }, f)
+        os.replace(f.name, cache_file)
+    except OSError:
+        pass
+    return title
+
+def dir_wipe_contents(path):
+    """ Delete everything inside a directory, leaving the directory itself """
+    for f in os.scandir(path):
+        if f.is_dir(follow_symlinks=False):
+            shutil.rmtree(f.path)
+        else:
+            os.unlink(f.path)
+
 def archive_url(url, archive_dir, verbose=False, throttle_downloads=False):
     """ Save an archived version of a webpage, along with all the
-        required media you'll need to view the page offline """
-
-    # Abort early if target url doesn't exist
-    page_exists, error = is_page_exists(url)
-    if not page_exists:
-        click.echo('error: '+error)
-        return None
+        required media you'll need to view the page offline. The caller
+        is expected to have already checked that the url exists. """
+    import sh
 
     # Use 'wget' to download an archive version of the webpage
     tmpdir = tempfile.TemporaryDirectory()
@@ -285,6 +440,7 @@ def archive_url(url, archive_dir, verbose=False, throttle_downloads=False):
         )
 
     html_file = None
+    line_format = format_colorize("#[fg=blue]{}#[none]")  # Evaluate style mnemonics ahead of time
     for line in sh.wget(wget_args, url,
                         #_err_to_out=True,
                         #_out=sys.stdout,
@@ -300,32 +456,27 @@ def archive_url(url, archive_dir, verbose=False, throttle_downloads=False):
                     html_file = line[pos1:pos2]
         if not verbose:
             continue
-        click.echo(
-            format_colorize("#[fg=blue]{}#[none]".format(line)),
-            nl=False
-        )
+        click.echo(line_format.format(line), nl=False)
 
     # Verify we extracted the target filename correctly
     if not os.path.isfile(html_file):
         raise RuntimeError('Expected archive file does not exist: {}'.format(html_file))
 
     # Wipe any pre-existing contents, so we don't leave orphaned files around
-    sh.mkdir(archive_dir, parents=True)
-    for f in os.scandir(archive_dir):
-        if f.is_dir():
-            sh.rm('-r', '-f', f.path)
-        if f.is_file():
-            sh.rm(f.path)
+    os.makedirs(archive_dir, exist_ok=True)
+    dir_wipe_contents(archive_dir)
 
-    # Copy the downloaded files to archive_dir
-    sh.rsync('-a', os.path.join(tmpdir.name, ""), archive_dir)
+    # Move the downloaded files to archive_dir
+    for f in os.scandir(tmpdir.name):
+        shutil.move(f.path, os.path.join(archive_dir, f.name))
 
     # Create a symlink pointing to the target html file
     html_file = html_file.replace(tmpdir.name, archive_dir)
     symlink_source = html_file.replace(os.path.join(archive_dir, ""), "")  # Relative path
     symlink_target = os.path.join(archive_dir, 'index.html')
-    sh.cd(archive_dir)
-    sh.ln('-f', '-s', symlink_source, symlink_target)
+    if os.path.lexists(symlink_target):
+        os.unlink(symlink_target)
+    os.symlink(symlink_source, symlink_target)
 
     # Cleanup staging directory
     tmpdir.cleanup()
@@ -340,11 +491,37 @@ def archive_url(url, archive_dir, verbose=False, throttle_downloads=False):
 
 def yaml_represent_OrderedDict(dumper, data):
     """ Representer for collections.OrderedDict, for yaml.dump """
+    import yaml
     return dumper.represent_mapping(
         yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
         data.items())
 
-yaml.add_representer(collections.OrderedDict, yaml_represent_OrderedDict)
+@functools.lru_cache(maxsize=None)
+def yaml_setup():
+    """
+    Import 'yaml' on first use, returning (yaml, loader, dumper).
+
+    Use the libyaml-based (C) loader/dumper when available, which are much
+    faster than the pure-Python versions for large multi-document streams.
+    """
+    import yaml
+    try:
+        loader, dumper = yaml.CSafeLoader, yaml.CSafeDumper
+    except AttributeError:
+        loader, dumper = yaml.SafeLoader, yaml.SafeDumper
+    dumper.add_representer(collections.OrderedDict, yaml_represent_OrderedDict)
+    return yaml, loader, dumper
+
+def yaml_dump_all(doc_list, stream=None):
+    """ Serialize a list of documents as a multi-document YAML string, or
+        write it out incrementally to stream (if given) """
+    yaml, loader, dumper = yaml_setup()
+    return yaml.dump_all(doc_list, stream=stream, Dumper=dumper)
+
+def yaml_load_all(text):
+    """ Parse a multi-document YAML string, returning a generator of documents """
+    yaml, loader, dumper = yaml_setup()
+    return yaml.load_all(text, Loader=loader)
 
 
 
@@ -388,6 +565,7 @@ def db_check_format_ver(allow_lower=False):
         sys.exit("Error: database '{}' is using an older format, use '{} upgrade'".format(LINKPAD_DBNAME, PROGRAM))
 
 def db_format_upgrade_db():
+    import sh
     db_check_format_ver(allow_lower=True)
     format_file = db_filepath_format_file()
     format_ver = db_format_ver()
@@ -421,9 +599,9 @@ def db_format_upgrade_db():
                 try:
                     _git('ls-files', '--error-unmatch', d.path)
                     git_tracked = True
-                except ErrorReturnCode_1:
+                except sh.ErrorReturnCode_1:
                     git_tracked = False
-                except ErrorReturnCode:
+                except sh.ErrorReturnCode:
                     sys.exit("Error checking 'git ls-files' for '{}'".format(d.path))
                 # Ignore subdirectories where the expected destination subdirectory already exists
                 entry_archive_dir_old = d.path
@@ -447,6 +625,7 @@ def db_format_upgrade_db():
 
 def db_create_db(dbname):
     """ Initialize new database """
+    import sh
     dbpath = os.path.join(LINKPAD_BASEDIR, dbname)
     if os.path.isdir(dbpath):
         sys.exit("Error: db_create_db(): directory already exists: {}".format(dbpath))
@@ -470,8 +649,8 @@ def db_load_db():
 
     dbfile = db_filepath_database_file()
     if os.path.isfile(dbfile):
-        with open(dbfile, 'r', encoding='utf-8') as f:
-            db_entry_list = [ db_entry_internalize(entry) for entry in json.load(f) ]
+        with open(dbfile, 'rb') as f:
+            db_entry_list = [ db_entry_internalize(entry) for entry in json_loads(f.read()) ]
     else:
         db_entry_list = []
     return db_entry_list
@@ -481,17 +660,27 @@ def db_save_db(db_entry_list):
     if not db_exists():
         sys.exit("Error: database '{}' does not exist".format(LINKPAD_DBNAME))
 
+    # JSON encode each entry individually so we can enforce newlines between
+    # each row, re-using a single encoder, and write out the result in one go
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    rows = [ encoder.encode(db_entry_externalize(db_entry_trim_empty_fields(entry)))
+             for entry in sorted(db_entry_list, key=operator.itemgetter('created_date')) ]
+
+    # Write to a temp file (flushed to disk) and then rename it into place, so
+    # an interrupted save or a crash can't leave a truncated database behind
     dbfile = db_filepath_database_file()
-    with open(dbfile, 'w', encoding='utf-8') as f:
-        # JSON encode each entry individually so we can enforce
-        # newlines between each row
-        first = True
-        for entry in sorted(db_entry_list, key=lambda entry: entry['created_date']):
-            f.write('[' if first else ',\n')
-            first = False
-            entry_save = db_entry_externalize(db_entry_trim_empty_fields(copy.deepcopy(entry)))
-            f.write(json.dumps(entry_save, separators=(',', ':')))
-        f.write(']')
+    tmpfile = dbfile + '.tmp'
+    try:
+        with open(tmpfile, 'w', encoding='utf-8') as f:
+            f.write('[' + ',\n'.join(rows) + ']')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpfile, dbfile)
+    except BaseException:
+        # Don't leave a stray temp file behind in the database repo
+        if os.path.exists(tmpfile):
+            os.unlink(tmpfile)
+        raise
 
 def db_entry_get(db_entry_list, url):
     """ Find an existing entry in the database based on url """
@@ -504,8 +693,14 @@ def db_entry_generate_id():
     """ Generate a new uuid for a new entry """
     return str(uuid.uuid4()).lower().replace('-','')
 
-def db_entry_externalize(entry, datetime_format='%Y-%m-%dT%H:%M:%SZ%z', datetime_as_local=False):
-    """ Convert an entry dict from internal to external format """
+def db_entry_generate_ids(count):
+    """ Generate a batch of new uuid's, drawing all the random bytes at once """
+    pool = os.urandom(16 * count)
+    return [ uuid.UUID(bytes=pool[i:i+16], version=4).hex for i in range(0, len(pool), 16) ]
+
+def db_entry_externalize(entry, datetime_format=DB_DATETIME_FORMAT, datetime_as_local=False):
+    """ Convert an entry dict from internal to external format, returning a new dict """
+    entry = copy.copy(entry)  # Shallow copy, we only replace top-level values
     # Convert date-type values to formatted date-strings
     for field in [ 'created_date', 'archived_date', 'removed_date' ]:
         if field in entry:
@@ -515,13 +710,22 @@ def db_entry_externalize(entry, datetime_format='%Y-%m-%dT%H:%M:%SZ%z', datetime
             entry[field] = date.strftime(datetime_format)
     return entry
 
-def db_entry_internalize(entry, datetime_format='%Y-%m-%dT%H:%M:%SZ%z'):
+def db_entry_internalize(entry, datetime_format=DB_DATETIME_FORMAT):
     """ Convert an entry dict from external to internal format """
     # Convert formatted date-strings to date-type values
     for field in [ 'created_date', 'archived_date', 'removed_date' ]:
         if field in entry:
-            date = datetime.datetime.strptime(entry[field], datetime_format)
-            entry[field] = date.astimezone(datetime.timezone.utc)  # Make sure datetime is UTC
+            value = entry[field]
+            if datetime_format == DB_DATETIME_FORMAT and len(value) == 25 and value.endswith('Z+0000'):
+                # Fast-path: dates are always saved as UTC in fixed-width
+                # "YYYY-MM-DDTHH:MM:SSZ+0000" form, so slice the fields out
+                # directly rather than going through strptime()
+                entry[field] = datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                                                 int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                                                 tzinfo=datetime.timezone.utc)
+            else:
+                date = datetime.datetime.strptime(value, datetime_format)
+                entry[field] = date.astimezone(datetime.timezone.utc)  # Make sure datetime is UTC
     # Make sure all public fields are present in the 'entry' collection
     for field in DB_ENTRY_PUBLIC_FIELDS:
         if not field in entry:
@@ -530,7 +734,7 @@ def db_entry_internalize(entry, datetime_format='%Y-%m-%dT%H:%M:%SZ%z'):
 
 def db_entry_trim_empty_fields(entry):
     """ Remove empty fields from an internal-format entry dict """
-    entry_trim = copy.deepcopy(entry)  # Make a copy to modify as needed
+    entry_trim = copy.copy(entry)  # Make a (shallow) copy to modify as needed
     for field in [ 'url', 'title', 'extended' ]:
         if field in entry:
             if (entry[field] is None) or \
@@ -541,10 +745,7 @@ def db_entry_trim_empty_fields(entry):
 def db_entry_to_editdoc(entry, include_private_fields=False, datetime_format='%Y-%m-%d %H:%M:%S %z', datetime_as_local=True, hide_empty=False):
     """ Return an OrderedDict containing the editable fields for an entry, for user-editing """
     doc = collections.OrderedDict()
-    fields = []
-    fields.extend(DB_ENTRY_PUBLIC_FIELDS)
-    if include_private_fields:
-        fields.extend(DB_ENTRY_PRIVATE_FIELDS)
+    fields = DB_ENTRY_ALL_FIELDS if include_private_fields else DB_ENTRY_PUBLIC_FIELDS
 
     for field in fields:
         if field in entry:
@@ -570,7 +771,8 @@ def db_entry_from_editdoc(doc, datetime_format='%Y-%m-%d %H:%M:%S %z'):
 
 def db_entry_add(db_entry_list, url, title, tags, extended, use_editor=True):
     """ Add a new entry to the database """
-    # If we already have an entry with this same url, abort
+    # If we already have an entry with this same url, abort (before spending
+    # any time fetching the webpage title)
     match = db_entry_get(db_entry_list, url)
     if match:
         sys.exit('Error: entry already exists for url "{}"'.format(url))
@@ -578,7 +780,7 @@ def db_entry_add(db_entry_list, url, title, tags, extended, use_editor=True):
     # Create a new entry
     entry = { 'id': db_entry_generate_id(),
               'url': url,
-              'title': title if title is not None else page_title(url),
+              'title': title if title is not None else page_title(url, timeout=PAGE_TITLE_TIMEOUT),
               'tags': list(sorted(dict.fromkeys(tags))) if tags is not None else [],  # Remove duplicate tags
               'created_date': datetime.datetime.now(datetime.timezone.utc),
               'extended': extended if extended is not None else '' }
@@ -596,14 +798,14 @@ def db_entry_list_edit(entry_list):
     doc_list = [ db_entry_to_editdoc(entry) for entry in entry_list ]
 
     # Convert the edit-doc list to YAML format and launch the editor
-    yaml_edited = click.edit(yaml.dump_all(doc_list),
+    yaml_edited = click.edit(yaml_dump_all(doc_list),
                              extension='.yaml',
                              require_save=True)
     if yaml_edited is None:
         return None
 
     # Map the post-edited external format back to internal format
-    doc_list = yaml.safe_load_all(yaml_edited)
+    doc_list = yaml_load_all(yaml_edited)
     entry_edit_list = [ db_entry_from_editdoc(doc) for doc in doc_list ]
 
     # Carry-forward any internal/private fields
@@ -625,144 +827,179 @@ def db_entry_list_edit(entry_list):
 def db_entry_list_update(db_entry_list, entry_list):
     """ Add/update entries in the database """
     changed_list = []
+    pos_by_id = { entry['id']: pos for pos, entry in enumerate(db_entry_list) }
     for new_entry in entry_list:
-        found = False
-        for pos, old_entry in enumerate(db_entry_list):
-            if old_entry['id'] == new_entry['id']:
-                found = True
-                changed = False
-                for key in old_entry:
-                    if not key in new_entry:
-                        changed = True
-                        break
-                    if old_entry[key] != new_entry[key]:
-                        changed = True
-                        break
-                for key in new_entry:
-                    if not key in old_entry:
-                        changed = True
-                        break
-                if changed:
-                    db_entry_list[pos] = new_entry
-                    changed_list.append(new_entry)
-                break
-        if not found:
+        pos = pos_by_id.get(new_entry['id'])
+        if pos is not None:
+            # Dict equality compares the key-sets and values in one C-level pass
+            if db_entry_list[pos] != new_entry:
+                db_entry_list[pos] = new_entry
+                changed_list.append(new_entry)
+        else:
+            pos_by_id[new_entry['id']] = len(db_entry_list)
             db_entry_list.append(new_entry)
             changed_list.append(new_entry)
 
     return changed_list if len(changed_list) > 0 else None
 
-def db_entry_list_archive(entry_list, verbose=False):
-    changed_list = []
-    for entry in entry_list:
-        if not entry['url'].lower().startswith('http'):
-            continue
+def db_entry_list_archive(entry_list, verbose=False, thread_count=8):
+    """ Archive a list of entries, running multiple archive jobs concurrently """
+    entry_list = [ entry for entry in entry_list if entry['url'].lower().startswith('http') ]
+    if len(entry_list) == 0:
+        return None
 
-        url = entry['url']
-        click.echo('archiving "{}" ...'.format(url))
-        archive_dir = db_filepath_entry_archive_dir(entry['id'])
-        if os.path.isdir(archive_dir):
-            # Wipe pre-existing contents, so we don't leave orphaned files around
-            for f in os.scandir(archive_dir):
-                if f.is_dir():
-                    sh.rm('-r', '-f', f.path)
-                if f.is_file():
-                    sh.rm(f.path)
-        archive_file = archive_url(url, archive_dir, verbose=verbose)
-        if archive_file is None:
-            continue
+    # Check that all the target urls exist up-front, concurrently, rather
+    # than waiting on each one serially before its wget run
+    exists_list = is_page_exists_many([ entry['url'] for entry in entry_list ], thread_count=thread_count)
 
-        edit_entry = copy.deepcopy(entry)
-        edit_entry['archived'] = True
-        edit_entry['archived_date'] = datetime.datetime.now(datetime.timezone.utc)
-        changed_list.append(edit_entry)
+    # Multi-thread the processing. Each job is almost entirely spent waiting
+    # on the network (the wget subprocess). In verbose mode,
+    # run one job at a time so each job's wget output isn't interleaved.
+    if verbose:
+        thread_count = 1
+    pool = multiprocessing.dummy.Pool(min(thread_count, len(entry_list)))
+    try:
+        results = pool.starmap(functools.partial(db_entry_archive, verbose=verbose),
+                               [ (entry, page_exists, error) for entry, (page_exists, error) in zip(entry_list, exists_list) ])
+    finally:
+        pool.close()
 
+    changed_list = [ edit_entry for edit_entry in results if edit_entry is not None ]
     return changed_list if len(changed_list) > 0 else None
 
+def db_entry_archive(entry, page_exists, error, verbose=False):
+    """ Archive a single entry, returning the edited entry (or None on failure) """
+    url = entry['url']
+    click.echo('archiving "{}" ...'.format(url))
+    archive_dir = db_filepath_entry_archive_dir(entry['id'])
+    if os.path.isdir(archive_dir):
+        # Wipe pre-existing contents, so we don't leave orphaned files around
+        dir_wipe_contents(archive_dir)
+    if not page_exists:
+        click.echo('error: "{}": {}'.format(url, error))
+        return None
+    archive_file = archive_url(url, archive_dir, verbose=verbose)
+    if archive_file is None:
+        return None
+
+    edit_entry = copy.copy(entry)  # Make a (shallow) copy, we only replace top-level fields
+    edit_entry['archived'] = True
+    edit_entry['archived_date'] = datetime.datetime.now(datetime.timezone.utc)
+    return edit_entry
+
 def db_entry_list_remove(db_entry_list, entry_list, hard_delete=False):
     """ Remove (or purge) a list of entries """
     changed_list = []
+    entry_by_id = { entry['id']: entry for entry in db_entry_list }
+    purge_ids = set()
     for rm_entry in entry_list:
-        for pos, entry in enumerate(db_entry_list):
-            if entry['id'] == rm_entry['id']:
-                if hard_delete:
-                    del db_entry_list[pos]
-                    entry['hard_deleted'] = True
-                    changed_list.append(entry)
-                else:
-                    if (not 'removed' in entry) or (not entry['removed']):
-                        entry['removed'] = True
-                        entry['removed_date'] = datetime.datetime.now(datetime.timezone.utc)
-                        changed_list.append(entry)
-                break
+        entry = entry_by_id.get(rm_entry['id'])
+        if entry is None:
+            continue
+        if hard_delete:
+            if entry['id'] in purge_ids:
+                continue
+            purge_ids.add(entry['id'])
+            entry['hard_deleted'] = True
+            changed_list.append(entry)
+        else:
+            if (not 'removed' in entry) or (not entry['removed']):
+                entry['removed'] = True
+                entry['removed_date'] = datetime.datetime.now(datetime.timezone.utc)
+                changed_list.append(entry)
+
+    # Purge all the hard-deleted entries in a single pass
+    if len(purge_ids) > 0:
+        db_entry_list[:] = [ entry for entry in db_entry_list if entry['id'] not in purge_ids ]
+
     return changed_list if len(changed_list) > 0 else None
 
 def db_entry_list_search(db_entry_list, search_args, include_removed=False):
     """ Find matching entries in the database """
-    # Parse the search args
+    entry_list = list(db_entry_list_search_iter(db_entry_list, search_args, include_removed=include_removed))
+    return entry_list if len(entry_list) > 0 else None
+
+def db_entry_list_search_iter(db_entry_list, search_args, include_removed=False):
+    """ Find matching entries in the database, yielding them one at a time """
+    # Parse the search args, once up-front
     search_all_list = []
     search_not_list = []
     search_any_list = []
     for arg in search_args:
         if arg[0] == "+":
-            search_all_list.append(arg[1:])
+            search_all_list.append(db_entry_search_parse(arg[1:]))
         elif arg[0] == "-":
-            search_not_list.append(arg[1:])
+            search_not_list.append(db_entry_search_parse(arg[1:]))
         else:
-            search_any_list.append(arg)
+            search_any_list.append(db_entry_search_parse(arg))
+    search_kinds = set(kind for kind, val in search_all_list + search_not_list + search_any_list)
 
-    # Build list of matching entries
-    entry_list = []
+    # Yield the matching entries
     for entry in db_entry_list:
         # Hide removed entries by default
         if entry.get('removed', False) and not include_removed:
             continue
 
         # Filter by search_args
+        fields = db_entry_search_fields(entry, search_kinds)
         if len(search_not_list) > 0:
-            if any(db_entry_search_match(entry, search_arg) for search_arg in search_not_list):
+            if any(db_entry_search_match(entry, fields, term) for term in search_not_list):
                 continue
         if len(search_all_list) > 0:
-            if not all(db_entry_search_match(entry, search_arg) for search_arg in search_all_list):
+            if not all(db_entry_search_match(entry, fields, term) for term in search_all_list):
                 continue
         if len(search_any_list) > 0:
-            if not any(db_entry_search_match(entry, search_arg) for search_arg in search_any_list):
+            if not any(db_entry_search_match(entry, fields, term) for term in search_any_list):
                 continue
 
-        entry_list.append(entry)
-
-    return entry_list if len(entry_list) > 0 else None
-
-def db_entry_search_match(entry, search_arg):
-    """ Check if this entry matches the given search_arg """
-    if search_arg[:6] == 'title:':
-        val = search_arg[6:]
-        return (val.lower() in entry['title'].lower() if len(val) > 0 else len(entry['title']) == 0)
-    elif search_arg[:4] == 'tag:':
-        val = search_arg[4:]
-        return (any(val.lower() in tag.lower() for tag in entry['tags']) if len(val) > 0 else len(entry['tags']) == 0)
-    elif search_arg[:5] == 'site:':
-        val = search_arg[5:]
-        url_domain = "{0.netloc}".format(urllib.parse.urlsplit(entry['url']))
-        return (val.lower() in url_domain.lower() if len(val) > 0 else len(url_domain) == 0)
-    elif search_arg[:4] == 'url:':
-        val = search_arg[4:]
-        return (val.lower() in entry['url'].lower() if len(val) > 0 else len(entry['url']) == 0)
-    elif search_arg[:3] == 'id:':
-        val = search_arg[3:]
-        return (val.lower() in entry['id'][0:len(val)].lower() if len(val) > 0 else len(entry['id']) == 0)
-    elif search_arg[:9] == 'archived:':
-        val = (search_arg[9:].lower() == 'true')
-        return (entry.get('archived', False) == val)
-    elif search_arg[:8] == 'removed:':
-        val = (search_arg[8:].lower() == 'true')
-        return (entry.get('removed', False) == val)
-    else:
-        string = "{} {} {} {}".format(entry['id'],
-                                      entry['title'],
-                                      entry['url'],
-                                      ' '.join(entry['tags']))
-        return (search_arg.lower() in string.lower())
+        yield entry
+
+def db_entry_search_parse(search_arg):
+    """ Parse a search_arg into a (kind, lowercased value) search term """
+    kind, sep, val = search_arg.partition(':')
+    if sep and kind != 'text' and kind in DB_ENTRY_SEARCH_MATCHERS:
+        return (kind, val.lower())
+    return ('text', search_arg.lower())
+
+def db_entry_search_fields(entry, search_kinds):
+    """ Get the lowercased entry fields needed by the given kinds of search terms """
+    fields = {}
+    if 'title' in search_kinds:
+        fields['title'] = entry['title'].lower()
+    if 'tag' in search_kinds:
+        fields['tag'] = [ tag.lower() for tag in entry['tags'] ]
+    if 'site' in search_kinds:
+        fields['site'] = url_netloc(entry['url']).lower()
+    if 'url' in search_kinds:
+        fields['url'] = entry['url'].lower()
+    if 'id' in search_kinds:
+        fields['id'] = entry['id'].lower()
+    if 'text' in search_kinds:
+        fields['text'] = "{} {} {} {}".format(entry['id'],
+                                              entry['title'],
+                                              entry['url'],
+                                              ' '.join(entry['tags'])).lower()
+    return fields
+
+# Match functions for each kind of search term: f(entry, fields, val)
+DB_ENTRY_SEARCH_MATCHERS = {
+    'title':    lambda entry, fields, val: (val in fields['title'] if len(val) > 0 else len(fields['title']) == 0),
+    'tag':      lambda entry, fields, val: (any(val in tag for tag in fields['tag']) if len(val) > 0 else len(fields['tag']) == 0),
+    'site':     lambda entry, fields, val: (val in fields['site'] if len(val) > 0 else len(fields['site']) == 0),
+    'url':      lambda entry, fields, val: (val in fields['url'] if len(val) > 0 else len(fields['url']) == 0),
+    'id':       lambda entry, fields, val: (fields['id'].startswith(val) if len(val) > 0 else len(fields['id']) == 0),
+    'archived': lambda entry, fields, val: (entry.get('archived', False) == (val == 'true')),
+    'removed':  lambda entry, fields, val: (entry.get('removed', False) == (val == 'true')),
+    'text':     lambda entry, fields, val: (val in fields['text']),
+}
+
+def db_entry_search_match(entry, fields, term):
+    """ Check if this entry matches the given (parsed) search term """
+    kind, val = term
+    return DB_ENTRY_SEARCH_MATCHERS[kind](entry, fields, val)
+
+# Matches the %variables in a print_format template
+PRINT_FORMAT_VARIABLE_RE = re.compile(r'%(shortid|id|url|title|tags|created_date|created_ago)')
 
 def db_entry_print(entry_list, print_format=None):
     """ Print entries based on print_format template """
@@ -771,28 +1008,41 @@ def db_entry_print(entry_list, print_format=None):
                    "#[fg=yellow]%shortid#[none] %title #[fg=cyan][%url]#[none] #[fg=brightgreen](%tags)#[none] #[fg=brightblack](%created_ago)#[none]"
     print_format_line = format_colorize(print_format)  # Evaluate style mnemonics ahead of time
 
+    # Compile the %variables into a str.format() template ahead of time,
+    # escaping any literal braces in the user-supplied format
+    print_format_line = print_format_line.replace('{', '{{').replace('}', '}}')
+    now = datetime.datetime.now(datetime.timezone.utc)  # Share one timestamp for all the relative dates
+    variables = {
+        'shortid':      lambda entry: entry['id'][:8],
+        'id':           lambda entry: entry['id'],
+        'url':          lambda entry: entry['url'],
+        'title':        lambda entry: entry['title'],
+        'tags':         lambda entry: ','.join(entry['tags']),
+        'created_date': lambda entry: datetime_utc_to_local(entry['created_date']).strftime('%Y-%m-%d %H:%M:%S %Z'),
+        'created_ago':  lambda entry: datetime_format_relative(entry['created_date'], now) }
+    used_variables = collections.OrderedDict()
+    def compile_variable(match):
+        used_variables[match.group(1)] = variables[match.group(1)]
+        return '{' + match.group(1) + '}'
+    print_format_line = PRINT_FORMAT_VARIABLE_RE.sub(compile_variable, print_format_line)
+
     for entry in entry_list:
-        # Build the final output line based on the print_format template
-        line = print_format_line
-        subs = [ ('%shortid', entry['id'][:8]),
-                 ('%id', entry['id']),
-                 ('%url', entry['url']),
-                 ('%title', entry['title']),
-                 ('%tags', ','.join(entry['tags'])),
-                 ('%created_date', datetime_utc_to_local(entry['created_date']).strftime('%Y-%m-%d %H:%M:%S %Z')),
-                 ('%created_ago', datetime_format_relative(entry['created_date'])) ]
-        for search, replacement in subs:
-            line = line.replace(search, replacement)
+        # Build the final output line based on the print_format template,
+        # only evaluating the variables which are actually used
+        line = print_format_line.format(**{ var: value(entry) for var, value in used_variables.items() })
         click.echo(line)
 
 def db_git_commit(commit_desc, archive_list=None):
     """ Use 'git add' and 'git commit' to commit any pending edits """
-    _git = sh.git.bake('-C', LINKPAD_DBPATH)  # Helper to run 'git' commands against this specific repo
+    # Collect all the paths first, so we can track them with (at most) a
+    # single 'git add' and a single 'git rm' run
+    add_paths = []
+    rm_paths = []
 
     # Track any changes to the database file
     db_file = db_filepath_database_file()
     if os.path.isfile(db_file):
-        _git.add(db_file)
+        add_paths.append(db_file)
 
     # Track any changes in entry archive files
     if archive_list is not None:
@@ -801,13 +1051,73 @@ def db_git_commit(commit_desc, archive_list=None):
             if not entry.get('archived', False):
                 continue
             if entry.get('hard_deleted', False):
-                _git.rm('-r', '-f', archive_dir)
+                rm_paths.append(archive_dir)
             else:
-                _git.add('-A', '-f', archive_dir)
+                add_paths.append(archive_dir)
+
+    # Optional: use 'pygit2' (if enabled via the 'use_pygit2' config option,
+    # and available) to update the index and commit in-process, rather than
+    # spawning several 'git' subprocesses. Note that this skips any git hooks
+    # and commit signing (e.g. 'commit.gpgsign').
+    pygit2 = None
+    if config_option(LINKPAD_CONFIG, 'use_pygit2', LINKPAD_DBNAME, getbool=True):
+        try:
+            import pygit2
+        except ImportError:
+            pass
+    if pygit2 is not None:
+        db_git_commit_pygit2(pygit2, commit_desc, add_paths, rm_paths)
+        return
+
+    import sh
+    _git = sh.git.bake('-C', LINKPAD_DBPATH)  # Helper to run 'git' commands against this specific repo
+    if len(rm_paths) > 0:
+        _git.rm('-r', '-f', '--', *rm_paths)
+    if len(add_paths) > 0:
+        _git.add('-A', '-f', '--', *add_paths)
 
     # Commit the tracked changes
     _git.commit('-q', '-m', commit_desc)
 
+def db_git_commit_pygit2(pygit2, commit_desc, add_paths, rm_paths):
+    """ Equivalent of 'git rm -r -f', 'git add -A -f' and 'git commit', using pygit2 """
+    repo = pygit2.Repository(LINKPAD_DBPATH)
+    index = repo.index
+    for path in rm_paths:
+        index.remove_all([ os.path.relpath(path, LINKPAD_DBPATH) ])
+        shutil.rmtree(path, ignore_errors=True)
+    for path in add_paths:
+        relpath = os.path.relpath(path, LINKPAD_DBPATH)
+        if os.path.isdir(path):
+            # Drop any stale entries for files which no longer exist, then
+            # (force-)add everything currently under the directory
+            index.remove_all([ relpath ])
+            for dirpath, dirnames, filenames in os.walk(path):
+                # Note: symlinks to directories are listed in dirnames (but not walked into)
+                for filename in filenames + [ name for name in dirnames if os.path.islink(os.path.join(dirpath, name)) ]:
+                    index.add(os.path.relpath(os.path.join(dirpath, filename), LINKPAD_DBPATH))
+        else:
+            index.add(relpath)
+    index.write()
+
+    # Commit the tracked changes, using the user's configured git identity
+    tree = index.write_tree()
+    parents = [] if repo.head_is_unborn else [ repo.head.target ]
+    repo.create_commit('HEAD',
+                       db_git_signature_pygit2(pygit2, repo, 'AUTHOR'),
+                       db_git_signature_pygit2(pygit2, repo, 'COMMITTER'),
+                       commit_desc + '\n', tree, parents)
+
+def db_git_signature_pygit2(pygit2, repo, role):
+    """ Get the author/committer signature, honoring $GIT_<role>_NAME/EMAIL like 'git commit' does """
+    try:
+        name = os.environ.get('GIT_{}_NAME'.format(role)) or repo.config['user.name']
+        email = os.environ.get('GIT_{}_EMAIL'.format(role)) or repo.config['user.email']
+    except KeyError as e:
+        sys.exit("Error: git identity unknown, config value {} is not set\n"
+                 "Run 'git config --global user.name ...' and 'git config --global user.email ...'".format(e))
+    return pygit2.Signature(name, email)
+
 
 
 ###
@@ -1007,9 +1317,11 @@ def command_edit(search_args, include_removed):
 
 @cli.command(name='archive', short_help='Create offline webpage archive of entries')
 @click.option('-v', '--verbose', 'verbose', is_flag=True,
-        help='Show verbose wget output')
+        help='Show verbose wget output (implies --jobs 1)')
+@click.option('-j', '--jobs', 'thread_count', metavar='NUM', default=8,
+        help='Set number of threads to use for processing')
 @click.argument('search_args', metavar='[ID]...', nargs=-1)
-def command_archive(search_args, verbose):
+def command_archive(search_args, verbose, thread_count):
     """
     Create/update an offline webpage archive for selected entries.
     """
@@ -1021,7 +1333,7 @@ def command_archive(search_args, verbose):
     click.echo('{} entries to archive'.format(len(entry_list)))
     if len(entry_list) > 5 and not click.confirm('Do you want to continue?'):
         sys.exit('User aborted')
-    archived_list = db_entry_list_archive(entry_list, verbose=verbose)
+    archived_list = db_entry_list_archive(entry_list, verbose=verbose, thread_count=thread_count)
     if archived_list is None:
         sys.exit('No changes found')
 
@@ -1125,7 +1437,7 @@ def command_list(search_args, include_removed, sort_key, sort_reverse, print_for
         sys.exit()
 
     # Display match entries, sorted by sort_key
-    entry_list = sorted(entry_list, key=lambda entry: entry[sort_key])
+    entry_list.sort(key=operator.itemgetter(sort_key))
     if sort_reverse:
         entry_list.reverse()
     db_entry_print(entry_list, print_format)
@@ -1198,15 +1510,15 @@ def command_show(search_args, include_removed, sort_key, sort_reverse):
         sys.exit()
 
     # Sort entry_list
-    entry_list = sorted(entry_list, key=lambda entry: entry[sort_key])
-
-    # Map the internal format entries to external edit-doc format
-    doc_list = [ db_entry_to_editdoc(entry, include_private_fields=True, hide_empty=True) for entry in entry_list ]
+    entry_list.sort(key=operator.itemgetter(sort_key))
     if sort_reverse:
-        doc_list.reverse()
+        entry_list.reverse()
 
-    # Convert the edit-doc list to YAML format and launch the editor
-    click.echo(yaml.dump_all(doc_list))
+    # Map the internal format entries to external edit-doc format, streaming
+    # the YAML output as we go rather than building it all up in memory
+    doc_list = ( db_entry_to_editdoc(entry, include_private_fields=True, hide_empty=True) for entry in entry_list )
+    yaml_dump_all(doc_list, stream=sys.stdout)
+    sys.stdout.write('\n')
 
 @cli.command(name='tags',
              short_help='List tags')
@@ -1241,46 +1553,46 @@ def command_tags(search_args, include_removed, show_count, sort_key, sort_revers
         TEXT           Any of these words (default)
        -TEXT           None of these words
     """
-    # Parse the search args
+    # Parse the search args (lowercased ahead of time, for case-insensitive matching)
     search_all_list = []
     search_not_list = []
     search_any_list = []
     for arg in search_args:
         if arg[0] == "+":
-            search_all_list.append(arg[1:])
+            search_all_list.append(arg[1:].lower())
         elif arg[0] == "-":
-            search_not_list.append(arg[1:])
+            search_not_list.append(arg[1:].lower())
         else:
-            search_any_list.append(arg)
+            search_any_list.append(arg.lower())
 
-    tag_list = {}
+    # Count the tag usage across all entries
+    tag_counts = collections.Counter()
     db_entry_list = db_load_db()
     for entry in db_entry_list:
         # Hide removed entries by default
         if entry.get('removed', False) and not include_removed:
             continue
-        for tag in entry['tags']:
-            # Apply search filters
-            if len(search_not_list) > 0:
-                if any((arg.lower() in tag.lower()) for arg in search_not_list):
-                    continue
-            if len(search_all_list) > 0:
-                if not all((arg.lower() in tag.lower()) for arg in search_all_list):
-                    continue
-            if len(search_any_list) > 0:
-                if not any((arg.lower() in tag.lower()) for arg in search_any_list):
-                    continue
+        tag_counts.update(entry['tags'])
 
-            if tag in tag_list:
-                tag_list[tag] += 1
-            else:
-                tag_list[tag] = 1
+    # Apply search filters, once per distinct tag
+    tag_list = collections.Counter()
+    for tag, count in tag_counts.items():
+        tag_lower = tag.lower()
+        if len(search_not_list) > 0:
+            if any((arg in tag_lower) for arg in search_not_list):
+                continue
+        if len(search_all_list) > 0:
+            if not all((arg in tag_lower) for arg in search_all_list):
+                continue
+        if len(search_any_list) > 0:
+            if not any((arg in tag_lower) for arg in search_any_list):
+                continue
+        tag_list[tag] = count
 
-    sorted_list = tag_list.keys()
-    if sort_key == 'name':
-        sorted_list = sorted(tag_list.keys())
     if sort_key == 'count':
-        sorted_list = [ key for key in sorted(tag_list, key=tag_list.get) ]
+        sorted_list = sorted(tag_list, key=tag_list.get)
+    else:
+        sorted_list = sorted(tag_list)
     if sort_reverse:
         sorted_list.reverse()
 
@@ -1303,21 +1615,34 @@ def command_check(search_args, thread_count, timeout):
     """
     # Create a list of dict's to process
     db_entry_list = db_load_db()
-    entry_list = db_entry_list_search(db_entry_list, search_args)
+    entry_list = list(db_entry_list_search_iter(db_entry_list, search_args))
     click.echo('{} urls to check (using {} threads) ...'.format(len(entry_list), thread_count), err=True)
 
     # Multi-thread the processing
     fail_count = 0
     fail_list = {}
+    entry_by_id = { entry['id']: entry for entry in entry_list }
+    entries_by_host = collections.OrderedDict()
+    for entry in entry_list:
+        entries_by_host.setdefault(check_url_host(entry['url']), []).append(entry)
+    host_limits = { host: { 'semaphore': threading.BoundedSemaphore(CHECK_URL_PER_HOST_LIMIT),
+                            'lock': threading.Lock(),
+                            'next_time': 0.0 }
+                    for host in entries_by_host }
+    # Interleave the entries round-robin across hosts, so that (while one
+    # host's checks are being paced) the pool threads mostly have other hosts
+    # to work on, rather than all queueing up behind the same busy host
+    check_list = [ entry for entries in itertools.zip_longest(*entries_by_host.values())
+                   for entry in entries if entry is not None ]
     pool = multiprocessing.dummy.Pool(thread_count)
-    with tqdm.tqdm(pool.imap_unordered(functools.partial(check_url, timeout=timeout), entry_list),
-                   total=len(entry_list),
-                   ascii=True) as bar:
-        for result in bar:
-            if not result['exists']:
+    with click.progressbar(pool.imap_unordered(functools.partial(check_url, timeout=timeout, host_limits=host_limits), check_list),
+                           length=len(entry_list),
+                           show_pos=True,
+                           file=sys.stderr) as bar:
+        for entry_id, exists, error in bar:
+            if not exists:
                 fail_count += 1
-                error = result['error']
-                entry = result['entry']
+                entry = entry_by_id[entry_id]
                 if error in fail_list:
                     fail_list[error].append(entry)
                 else:
@@ -1326,25 +1651,41 @@ def command_check(search_args, thread_count, timeout):
     # Summary
     for error in sorted(fail_list.keys()):
         click.echo(error)
-        for entry in fail_list[error]:
-            db_entry_print([ entry ], "  #[fg=yellow]%shortid#[none] #[fg=cyan]%url#[none]")
+        db_entry_print(fail_list[error], "  #[fg=yellow]%shortid#[none] #[fg=cyan]%url#[none]")
         click.echo("")
 
     click.echo('found {} broken links'.format(fail_count), err=True)
 
-def check_url(entry, timeout):
-    # Sleep between calls to prevent swamping remote server (if there are
-    # multiple adjacent entries on the same website), to avoid getting
-    # transient 502/503 status errors
-    time.sleep(random.uniform(0,3))
+# Max number of concurrent checks against the same website, and the minimum
+# delay (in seconds) between starting successive checks against it
+CHECK_URL_PER_HOST_LIMIT = 2
+CHECK_URL_PER_HOST_INTERVAL = 1.0
 
-    page_exists, error = is_page_exists(entry['url'], timeout=timeout)
-    ret = {
-        'entry': copy.deepcopy(entry),
-        'exists': page_exists,
-        'error': error,
-    }
-    return ret
+def check_url_host(url):
+    """ Get the per-host limit key for a url. Malformed urls (which urlsplit()
+        rejects) are keyed on the raw url, and left for is_page_exists() to
+        report as broken """
+    try:
+        return url_netloc(url)
+    except ValueError:
+        return url
+
+def check_url(entry, timeout, host_limits):
+    # Limit the number of concurrent calls per-host, and space out the start
+    # of successive calls, to prevent swamping remote server (if there are
+    # multiple entries on the same website), to avoid getting transient
+    # 502/503 status errors
+    host_limit = host_limits[check_url_host(entry['url'])]
+    with host_limit['semaphore']:
+        # Reserve the next start-time slot for this host
+        with host_limit['lock']:
+            start_time = max(time.monotonic(), host_limit['next_time'])
+            host_limit['next_time'] = start_time + CHECK_URL_PER_HOST_INTERVAL
+        delay = start_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        page_exists, error = is_page_exists(entry['url'], timeout=timeout)
+    return (entry['id'], page_exists, error)
 
 @cli.command(name='config',
              short_help='Show configuration')
@@ -1369,6 +1710,8 @@ def command_config():
        archive ............ Set to 'true' to enable --archive in `linkpad add`
        print_format ....... --print_format to use in `linkpad list`
        fzf_print_format ... --print_format to use in `linkpad list`
+       use_pygit2 ......... Set to 'true' to commit changes using pygit2
+                            (if installed) rather than running `git`
 
     """
     if LINKPAD_CONFIG is not None:
@@ -1425,9 +1768,14 @@ def command_db_list(full_path):
     """
     List available database names
     """
-    for entry in os.scandir(LINKPAD_BASEDIR):
-        if entry.is_dir() and db_exists(entry.name):
-            click.echo(entry.path if full_path else entry.name)
+    # Collect all the names first, so we can emit them with a single write.
+    # Re-use the DirEntry's is_dir() rather than calling db_exists(), which
+    # would stat() each directory again.
+    names = [ entry.path if full_path else entry.name
+              for entry in os.scandir(LINKPAD_BASEDIR)
+              if entry.is_dir() and os.path.isfile(db_filepath_format_file(entry.path)) ]
+    if len(names) > 0:
+        click.echo('\n'.join(names))
 
 @command_db.command(name='env')
 @click.argument('dbname', required=False)
@@ -1465,6 +1813,7 @@ def command_db_clone(url, dbname):
 
     Shortcut for `git clone GIT_URL $HOME/.linkpad/$DBNAME`
     """
+    import sh
     if db_exists(dbname):
         sys.exit("Error: database '{}' already exists".format(dbname))
     if not os.path.isdir(LINKPAD_BASEDIR):
@@ -1499,6 +1848,33 @@ def command_import():
     """ Import entries from a flat file """
     pass
 
+# Flatten newlines in imported titles, in a single str.translate() pass
+PINBOARD_TITLE_TRANS = str.maketrans({ "\n": " ", "\r": None })
+
+def pinboard_item_to_entry(import_item):
+    """ Map a Pinboard JSON export item to a (new, id-less) local entry dict """
+    # Pinboard timestamps are always "YYYY-MM-DDTHH:MM:SSZ", so slice the
+    # fields out directly rather than going through strptime()
+    item_time = import_item['time']
+    if len(item_time) != 20 or item_time[4] != '-' or item_time[10] != 'T' or item_time[19] != 'Z':
+        raise ValueError('Invalid Pinboard timestamp "{}"'.format(item_time))
+    # Map import schema to local schema
+    import_entry = {
+        'url': import_item['href'],
+        'title': import_item.get('description',"").translate(PINBOARD_TITLE_TRANS).strip(),
+        'extended': import_item.get('extended',"").strip(),
+        'tags': sorted(set(import_item.get('tags',"").split())),  # Remove empty and duplicate tags
+        'created_date': datetime.datetime(int(item_time[0:4]), int(item_time[5:7]), int(item_time[8:10]),
+                                          int(item_time[11:13]), int(item_time[14:16]), int(item_time[17:19]),
+                                          tzinfo=datetime.timezone.utc)
+        }
+    for field in DB_ENTRY_PUBLIC_FIELDS:
+        if field == 'id':  # Don't set a blank 'id' field
+            continue
+        if field not in import_entry:
+            import_entry[field] = ''
+    return import_entry
+
 @command_import.command(name='pinboard-json')
 @click.option('-n', '--dry-run', 'dry_run', is_flag=True,
         help='Show what would have been imported')
@@ -1508,56 +1884,63 @@ def command_import():
 def command_import_pinboard(jsonfile, verbose, dry_run):
     """ Import entries from a Pinboard JSON export """
     # Load JSON file
-    with open(jsonfile, 'r', encoding='utf-8') as f:
-        import_list = reversed(json.load(f))  # Reverse list to process in oldest -> newest order
+    with open(jsonfile, 'rb') as f:
+        import_list = json_loads(f.read())
+    import_list.reverse()  # Reverse list (in-place) to process in oldest -> newest order
 
     # Load existing entries, for de-duplication
     db_entry_list = db_load_db()
+    db_entry_by_url = { entry['url']: entry for entry in db_entry_list }
+    db_url_counts = collections.Counter(entry['url'] for entry in db_entry_list)
 
     # Process all the import entries
     dry_run_prefix = '(dry-run) ' if dry_run else ''
+    updated_format = format_colorize('{}#[fg=yellow]{}#[none] updated {}: "{}" --> "{}"')  # Evaluate style mnemonics ahead of time
     edit_list = []
-    for import_item in import_list:
-        # Map import schema to local schema
-        import_entry = {
-            'url': import_item['href'],
-            'title': import_item.get('description',"").replace("\n"," ").replace("\r","").strip(),
-            'extended': import_item.get('extended',"").strip(),
-            'tags': sorted(import_item.get('tags',"").split(' ')) if len(import_item.get('tags')) > 0 else [],
-            'created_date': datetime.datetime.strptime(
-                import_item['time'],"%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
-            }
-        for field in DB_ENTRY_PUBLIC_FIELDS:
-            if field == 'id':  # Don't set a blank 'id' field
-                continue
-            if field not in import_entry:
-                import_entry[field] = ''
-
-        # If there's an existing entry with this same url, update that entry instead
-        matches = [ entry for entry in db_entry_list if import_entry['url'] == entry['url'] ]
-        if len(matches) > 1:
-            raise Exception('Internal Error: found multiple matching entries for url "{}"'.format(import_entry['url']))
-        if len(matches) > 0:
-            entry = copy.deepcopy(matches[0])  # Make a mutable copy of 'entry'
+    edit_by_url = {}  # url -> pending entry in edit_list
+    new_ids = iter(db_entry_generate_ids(len(import_list)))  # Pre-generate id's for (at most) every import item
+    log_buf = []  # Buffer verbose output, to write it out in batches
+    for import_entry in map(pinboard_item_to_entry, import_list):
+        if len(log_buf) >= 1000:
+            click.echo('\n'.join(log_buf))
+            log_buf.clear()
+
+        # If this same url was already seen earlier in the import file, fold
+        # any changes into that pending entry. Else if there's an existing
+        # entry with this same url, update that entry instead.
+        url = import_entry['url']
+        entry = edit_by_url.get(url)
+        if entry is None and url in db_entry_by_url:
+            if db_url_counts[url] > 1:
+                raise Exception('Internal Error: found multiple matching entries for url "{}"'.format(url))
+            match = db_entry_by_url[url]
+            if { key: match.get(key) for key in import_entry } == import_entry:
+                continue  # No changes, skip the per-key diff (and the copy) entirely
+            entry = copy.copy(match)  # Make a (shallow) mutable copy of 'entry'
+        if entry is not None:
             # Look for difference between entry vs import_entry
-            changed = False
-            for key in import_entry:
-                if entry.get(key) != import_entry.get(key):
+            changed_keys = [ key for key in import_entry if entry.get(key) != import_entry.get(key) ]
+            if len(changed_keys) > 0:
+                shortid = entry['id'][:8]
+                for key in changed_keys:
+                    old_value = entry.get(key)
+                    new_value = import_entry[key]
                     if verbose:
-                        click.echo(
-                            format_colorize('{}#[fg=yellow]{}#[none] updated {}: "{}" --> "{}"').format(
-                            dry_run_prefix, entry['id'][:8], key, entry.get(key), import_entry.get(key)))
-                    entry[key] = import_entry[key]
-                    changed = True
-                if changed:
+                        log_buf.append(updated_format.format(dry_run_prefix, shortid, key, old_value, new_value))
+                    entry[key] = new_value
+                if url not in edit_by_url:
                     edit_list.append(entry)
+                    edit_by_url[url] = entry
         # Othewise create a brand-new entry
         else:
-            entry = copy.deepcopy(import_entry)
-            entry['id'] = db_entry_generate_id()
+            entry = import_entry  # Freshly built by pinboard_item_to_entry(), no need to copy
+            entry['id'] = next(new_ids)
             if verbose:
-                click.echo('{}imported {}: {}'.format(dry_run_prefix, entry['id'][0:8], entry['url']))
+                log_buf.append('{}imported {}: {}'.format(dry_run_prefix, entry['id'][:8], url))
             edit_list.append(entry)
+            edit_by_url[url] = entry
+    if len(log_buf) > 0:
+        click.echo('\n'.join(log_buf))
 
     if len(edit_list) < 1:
         sys.exit('No changes to import')
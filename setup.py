@@ -12,10 +12,12 @@ setup(
         'click',
         'pyyaml',
         'sh',
-        'bs4',
-        'requests',
-        'tqdm',
+        'beautifulsoup4',
+        'requests>=2.18',
     ],
+    extras_require={
+        'fast': ['orjson', 'pygit2'],
+    },
     license='MIT',
     entry_points="""
         [console_scripts]